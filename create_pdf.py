@@ -1,15 +1,14 @@
 import os
-from get_data import get_pn_for, get_sdr_for, load_weight_table, get_discount
-from price_calculator import calculate_total_mass, calculate_price, calculate_length_from_mass, calculate_price_per_kg_from_total
-from datetime import datetime
-import requests
-from num2words import num2words
+from datetime import date
 from reportlab.lib.pagesizes import A4, landscape
 
-# Define PAGE_WIDTH, PAGE_HEIGHT for landscape A4
-PAGE_WIDTH, PAGE_HEIGHT = landscape(A4)
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+# Define PAGE_SIZE (PAGE_WIDTH, PAGE_HEIGHT) for landscape A4
+PAGE_SIZE = landscape(A4)
+PAGE_WIDTH, PAGE_HEIGHT = PAGE_SIZE
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
+from PIL import Image as PILImage
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from bidi.algorithm import get_display
@@ -20,48 +19,184 @@ from reportlab.pdfbase.ttfonts import TTFont
 from persiantools import digits
 import json
 import csv
+import threading
+import functools
+import multiprocessing
+from bisect import bisect_right
+from itertools import repeat
+from operator import itemgetter
 from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows: counter updates are still atomic, just unlocked
+    fcntl = None
 
 # Use "program files" instead of "dependencies"
-font_path = os.path.join(os.path.dirname(__file__), "program files", "DejaVuSans.ttf")
-if os.path.exists(font_path):
+_BASE_DIR = os.path.dirname(__file__)
+font_path = os.path.join(_BASE_DIR, "program files", "DejaVuSans.ttf")
+# The TTF is parsed on registration; skip it if a previous import (reload,
+# test runner) already registered the font in this process
+if "Persian" in pdfmetrics.getRegisteredFontNames():
+    DEFAULT_FONT = "Persian"
+elif os.path.exists(font_path):
     pdfmetrics.registerFont(TTFont("Persian", font_path))
     DEFAULT_FONT = "Persian"
 else:
     DEFAULT_FONT = "Helvetica"
 
 # Ensure program files directory exists
-DEPENDENCIES_DIR = os.path.join(os.path.dirname(__file__), "program files")
+DEPENDENCIES_DIR = os.path.join(_BASE_DIR, "program files")
 os.makedirs(DEPENDENCIES_DIR, exist_ok=True)
 # Constants
-INVOICE_COUNTER_FILE = os.path.join(DEPENDENCIES_DIR, "invoice_counter.json")
+# The GUI's invoice counter; every entry point numbers invoices from it
+INVOICE_COUNTER_FILE = os.path.join(os.path.expanduser("~"), ".invoice_app_counter.json")
+DISCOUNT_CSV_FILE = os.path.join(DEPENDENCIES_DIR, "discount.csv")
+DEFAULT_OUTPUT_DIR = os.path.join(_BASE_DIR, "خروجی")
 COMPANY_NAME = "شرکت پلی غرب"
 
-# Default company information used when optional fields are not provided
-DEFAULT_COMPANY_INFO = {
-    "name": "شرکت پلی غرب اتصال ایرانیان (سهامی خاص)",
-    "address": "میرداماد میدان محسنی خیابان شاه نظری کوچه دوم پلاک ۳۴ واحد اول شمالی",
-    "phone": "02122922999",
-    "fax": "02122278331",
+# Column headers of the pipe items table (logical RTL order)
+PIPE_HEADERS_TEXT = ("شماره","قطر (mm)","SDR","گرید","طول (m)","وزن/متر (kg)","وزن کل (kg)","قیمت/kg","قیمت کل (تومان)")
+# Column headers of the connection items table (logical RTL order)
+CONN_HEADERS_TEXT = ("نوع اتصال", "محصول", "فشار قابل تحمل", "سایز", "تعداد", "قیمت واحد", "قیمت کل")
+
+
+@functools.lru_cache(maxsize=512)
+def _shape(text: str) -> str:
+    """Return ``text`` reshaped and reordered for RTL display (memoized).
+
+    Pure-ASCII strings (amounts, invoice numbers) contain no RTL characters,
+    so they are returned unchanged without running reshape/BiDi.
+    """
+    if text.isascii():
+        return text
+    return get_display(reshape(text))
+
+
+# Static labels shaped for RTL display once at import, not on every invoice
+_SH_COMPANY = _shape(COMPANY_NAME)
+_SH_LABEL_CUST = _shape("نام مشتری:")
+_SH_HEADERS_REV = tuple(_shape(h) for h in reversed(PIPE_HEADERS_TEXT))
+_SH_CONN_HEADERS_REV = tuple(_shape(h) for h in reversed(CONN_HEADERS_TEXT))
+_SH_TOTAL_LABEL = _shape("جمع کل:")
+_SH_TOTAL_LABEL_SPACED = _shape("جمع کل :")
+_SH_ADDED_LABEL = _shape("مالیات بر ارزش افزوده:")
+_SH_ADDED_LABEL_SPACED = _shape("مالیات بر ارزش افزوده :")
+_SH_DISCOUNT_LABEL = _shape("تخفیف :")
+_SH_EXPLANATION_LABEL = _shape("توضیحات:")
+# Connection invoices label their footer rows without a colon
+_SH_CONN_TOTAL_LABEL = _shape("جمع کل")
+_SH_CONN_DISCOUNT_LABEL = _shape("تخفیف")
+_SH_CONN_ADDED_LABEL = _shape("مالیات بر ارزش افزوده")
+# (discount, added value, total) footer labels of the discount + added-value invoices
+_ITEM_DISCOUNT_ADDED_LABELS = (_SH_DISCOUNT_LABEL, _SH_ADDED_LABEL_SPACED, _SH_TOTAL_LABEL_SPACED)
+_CONN_DISCOUNT_ADDED_LABELS = (_SH_CONN_DISCOUNT_LABEL, _SH_CONN_ADDED_LABEL, _SH_CONN_TOTAL_LABEL)
+
+
+# Shared styles; these are read-only once built, so every invoice reuses them
+_TITLE_STYLE = ParagraphStyle(
+    name="CompanyTitle", fontName=DEFAULT_FONT, fontSize=18, alignment=TA_CENTER, leading=22
+)
+_HEADER_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+])
+# Every pipe items row is a single line of 9pt text: leading (1.2 x font size)
+# plus the default 3pt top and bottom padding. Passing it as a fixed height
+# lets Table skip measuring each cell when laying out and splitting the table.
+_ITEM_ROW_HEIGHT = 9 * 1.2 + 6
+# Same for the connection items table, which uses 10pt text
+_CONN_ROW_HEIGHT = 10 * 1.2 + 6
+# Column widths of the pipe items table in display (RTL) order, total price
+# first. The added-value variants widen the price-per-kg column.
+_ITEM_COL_WIDTHS = (100, 60, 60, 60, 50, 50, 30, 60, 40)
+_ITEM_COL_WIDTHS_ADDED = (100, 100, 60, 60, 50, 50, 30, 60, 40)
+_ITEM_COL_WIDTHS_DISCOUNT_ADDED = (100, 105, 60, 60, 50, 50, 30, 60, 40)
+# Label / value columns of the date, invoice number and customer table
+_HEADER_COL_WIDTHS = (100, 400)
+# Empty trailing cells of the footer rows (value, label, then blanks)
+_ITEM_FOOTER_BLANKS = ("",) * 7
+_CONN_FOOTER_BLANKS = ("",) * 5
+# Base commands of the pipe items table; variants append their footer-row highlights
+_ITEM_TABLE_BASE_CMDS = [
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 9),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+]
+# Pipe items tables, keyed by the number of footer rows: each footer row's
+# value and label are highlighted and the label is left-aligned
+_ITEM_TABLE_STYLES = {
+    footer_rows: TableStyle(
+        _ITEM_TABLE_BASE_CMDS
+        + [cmd for row in range(footer_rows, 0, -1) for cmd in (
+            ('BACKGROUND', (0, -row), (1, -row), colors.lightgrey),
+            ('ALIGN', (1, -row), (1, -row), 'LEFT'),
+        )]
+    )
+    for footer_rows in (1, 2, 3)
 }
+# The added-value invoice keeps its added-value label centred
+_ITEM_TABLE_STYLE_ADDED = TableStyle(_ITEM_TABLE_BASE_CMDS + [
+    ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
+    ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
+    ('ALIGN', (1, -1), (1, -1), 'LEFT'),
+])
+# Connection items tables: 10pt text, with the last 1-3 footer rows highlighted
+_CONN_TABLE_BASE_CMDS = [
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 10),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+]
+_CONN_TABLE_STYLES = {
+    footer_rows: TableStyle(
+        _CONN_TABLE_BASE_CMDS
+        + [('BACKGROUND', (0, -row), (1, -row), colors.lightgrey) for row in range(footer_rows, 0, -1)]
+        + [('ALIGN', (1, -1), (1, -1), 'LEFT')]
+    )
+    for footer_rows in (1, 2, 3)
+}
+_EXPLANATION_LABEL_STYLE = ParagraphStyle(
+    name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
+    alignment=TA_RIGHT, leading=14, spaceBefore=6
+)
+_EXPLANATION_TEXT_STYLE = ParagraphStyle(
+    name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
+    alignment=TA_RIGHT, leading=14, rightIndent=0
+)
+_TOTAL_WORDS_STYLE = ParagraphStyle(name="TotalWords", fontName=DEFAULT_FONT, fontSize=10, alignment=TA_RIGHT)
+
+
+@functools.lru_cache(maxsize=1)
+def _jalali_date(day: date) -> str:
+    """Return ``day`` formatted as a Jalali date (memoized for the current day)."""
+    return JalaliDate(day).strftime("%Y/%m/%d")
 
 
 def fetch_current_jalali_date() -> str:
-    """Return today's date in Jalali format using an internet time service."""
-    try:
-        resp = requests.get("https://worldtimeapi.org/api/ip", timeout=5)
-        resp.raise_for_status()
-        iso_dt = resp.json().get("datetime")
-        dt = datetime.fromisoformat(iso_dt.rstrip("Z")) if iso_dt else datetime.utcnow()
-    except Exception:
-        dt = datetime.utcnow()
-    return JalaliDate(dt).strftime("%Y/%m/%d")
+    """Return today's date in Jalali format from the local clock."""
+    return _jalali_date(date.today())
+
+
+@functools.lru_cache(maxsize=1024)
+def _num2words_fa(number: int) -> str:
+    """Return ``number`` in Persian words (memoized; totals often repeat)."""
+    # Imported on first use: num2words loads every language module up front
+    from num2words import num2words
+
+    return num2words(number, lang="fa")
 
 
 def number_to_words(value: float) -> str:
     """Convert a numeric value to Persian words."""
     try:
-        return num2words(int(value), lang="fa")
+        return _num2words_fa(int(value))
     except Exception:
         return str(value)
 
@@ -69,172 +204,356 @@ def number_to_words(value: float) -> str:
 def append_total_words(elements, total: float):
     """Append the total amount in words to the elements list."""
     words = number_to_words(total)
-    line = str(get_display(reshape(f"مبلغ به حروف: {words} تومان")))
-    style = ParagraphStyle(name="TotalWords", fontName=DEFAULT_FONT, fontSize=10, alignment=TA_RIGHT)
+    line = _shape(f"مبلغ به حروف: {words} تومان")
     elements.append(Spacer(1, 12))
-    elements.append(Paragraph(line, style))
+    elements.append(Paragraph(line, _TOTAL_WORDS_STYLE))
 
 
 # Helper for invoice numbering
-def _get_next_invoice_number():
-    """Return the next invoice number as an unpadded string.
+def write_invoice_counter(path: str, counter: int) -> None:
+    """Atomically store ``{"counter": counter}`` in the JSON file at ``path``.
 
-    The function reads ``invoice_counter.json`` from the ``program files``
-    directory, increments the stored ``counter`` value and writes it back.
-    The resulting invoice number is returned directly without any zero
-    padding.
+    The payload is written with a single ``os.write`` to a temporary file in
+    the same directory which is then renamed over ``path``, so readers never
+    see a truncated counter file.
+    """
+    # Same bytes json.dump would produce, without the encoder or io stack
+    payload = b'{"counter": %d}' % int(counter)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _reserve_invoice_numbers(count: int) -> int:
+    """Reserve ``count`` consecutive invoice numbers and return the first one.
+
+    ``INVOICE_COUNTER_FILE`` is read and written back exactly once, under an
+    exclusive lock where ``fcntl`` is available, so concurrent callers never
+    hand out the same number.
     """
-    if os.path.exists(INVOICE_COUNTER_FILE):
+    with open(INVOICE_COUNTER_FILE + ".lock", 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        # Only a missing or unparsable file starts numbering afresh; anything
+        # else must not reset the counter and overwrite issued invoices.
         try:
             with open(INVOICE_COUNTER_FILE, 'r') as f:
                 data = json.load(f)
-        except (ValueError, KeyError):
+        except (FileNotFoundError, ValueError):
             data = {'counter': 0}
-    else:
-        data = {'counter': 0}
-    data['counter'] += 1
-    with open(INVOICE_COUNTER_FILE, 'w') as f:
-        json.dump(data, f)
+        counter = data['counter']
+        write_invoice_counter(INVOICE_COUNTER_FILE, counter + count)
+    return counter + 1
+
+
+def _get_next_invoice_number():
+    """Return the next invoice number as an unpadded string.
+
+    The function reads ``INVOICE_COUNTER_FILE`` (the counter the GUI uses),
+    increments the stored ``counter`` value and writes it back.
+    The resulting invoice number is returned directly without any zero
+    padding.
+    """
     # Return as plain integer string (no leading zeros)
-    return str(data['counter'])
+    return str(_reserve_invoice_numbers(1))
 
 
 def to_persian_digits(text):
     return digits.en_to_fa(str(text))
 
-def generate_pdf(customer_name: str, invoice_number: str, items: list[dict], output_dir: Optional[str] = None, explanation_text: Optional[str] = None):
+# Persian and Arabic-Indic digits -> ASCII digits, for str.translate
+_FA_TO_EN = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
+# Pulls every field used by the pipe items table out of an item dict in one call
+_ITEM_FIELDS = itemgetter(
+    "diameter", "sdr", "pe_grade", "length", "weight_per_meter",
+    "total_weight", "price_per_kg", "total_price",
+)
+
+
+def _build_item_rows(items: list[dict]) -> tuple[list[list[str]], float]:
+    """Build the pipe item rows (in RTL column order) and the invoice total.
+
+    Fields are transposed out of the dicts in a single pass and each row's
+    nine cells are formatted directly in visual RTL order.
     """
-    Generates a PDF invoice for a customer.
+    if not items:
+        return [], 0.0
+    (diameters, sdrs, grades, lengths, weights_per_meter,
+     total_weights, prices_per_kg, total_prices) = zip(*map(_ITEM_FIELDS, items))
+
+    rows = [
+        [f"{tp:,}", f"{ppk:,}", f"{tw:.3f}", f"{wpm:.3f}", f"{length:.2f}", grade, str(sdr), str(dia), str(n)]
+        for n, dia, sdr, grade, length, wpm, tw, ppk, tp in zip(
+            range(1, len(items) + 1),
+            map(int, diameters),
+            map(int, sdrs),
+            # Ensure grade uses English digits; any Persian text left in a
+            # grade is shaped once per distinct value via the memoized _shape
+            map(_shape, map(str.translate, grades, repeat(_FA_TO_EN))),
+            lengths,
+            weights_per_meter,
+            total_weights,
+            map(int, prices_per_kg),
+            map(int, total_prices),
+        )
+    ]
+    return rows, sum(total_prices, 0.0)
 
-    Args:
-        customer_name (str): The name of the customer.
-        invoice_number (str): The invoice number.
-        items (list[dict]): A list of item dictionaries with invoice details.
-        output_dir (str, optional): Path to the directory where the PDF will be saved. Defaults to None, which uses the module's 'خروجی' directory.
-        explanation_text (str, optional): Additional explanation text to include in the PDF.
+
+def _conn_item_rows(items: list[dict]):
+    """Yield the connection item rows in display (RTL) order: total price ... type.
+
+    Amounts and quantities are plain ASCII digits, so only the catalogue text
+    cells go through _shape.
+    """
+    for itm in items:
+        yield [
+            f"{int(itm.get('total_price', 0)):,}",
+            f"{int(itm.get('unit_price', 0)):,}",
+            f"{int(itm.get('quantity', 1))}",
+            _shape(str(itm.get("size", ""))),
+            _shape(str(itm.get("pn", ""))),
+            _shape(str(itm.get("product", ""))),
+            _shape(str(itm.get("type", ""))),
+        ]
+
+
+# Parsed discount tiers, reused until discount.csv changes on disk
+_DISCOUNT_CACHE = {"mtime": None, "thresholds": ((0.0, 0.0),)}
+
+
+def _get_thresholds() -> tuple[tuple[float, float], ...]:
+    """Return the sorted discount tiers from discount.csv with a (0, 0) sentinel.
+
+    The parsed tiers are cached and only re-read when the file's mtime changes.
+    """
+    try:
+        mtime = os.stat(DISCOUNT_CSV_FILE).st_mtime
+    except OSError:
+        mtime = None
+    if mtime == _DISCOUNT_CACHE["mtime"]:
+        return _DISCOUNT_CACHE["thresholds"]
+
+    thresholds = []
+    if mtime is not None:
+        with open(DISCOUNT_CSV_FILE, newline='') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if len(row) >= 2:
+                    try:
+                        thresholds.append((float(row[0]), float(row[1])))
+                    except ValueError:
+                        continue
+    thresholds.sort(key=lambda x: x[0])
+    thresholds.insert(0, (0.0, 0.0))  # zero-threshold for no discount below first step
+    _DISCOUNT_CACHE["mtime"] = mtime
+    _DISCOUNT_CACHE["thresholds"] = tuple(thresholds)
+    return _DISCOUNT_CACHE["thresholds"]
+
+
+@functools.lru_cache(maxsize=8)
+def _discount_brackets(thresholds: tuple) -> tuple[list[float], list[float]]:
+    """Return the tier lower bounds and the discount accrued below each bound."""
+    lowers = [lower for lower, _ in thresholds]
+    accrued = [0.0]
+    for (lower, pct), upper in zip(thresholds, lowers[1:]):
+        accrued.append(accrued[-1] + (upper - lower) * (pct / 100.0))
+    return lowers, accrued
+
+
+def _tiered_discount(total: float, thresholds) -> float:
+    """Return the tiered discount for ``total``.
+
+    Each tier's percentage applies only to the part of ``total`` that falls
+    between its threshold and the next one. The discount accrued by the full
+    tiers below each threshold is precomputed per thresholds table, so only
+    the tier containing ``total`` is evaluated (found by bisection).
+    """
+    lowers, accrued = _discount_brackets(tuple(thresholds))
+    i = bisect_right(lowers, total) - 1
+    if i < 0:
+        return 0.0
+    lower, pct = thresholds[i]
+    return accrued[i] + (total - lower) * (pct / 100.0)
+
+
+_LOGO_PATH = os.path.join(DEPENDENCIES_DIR, "logo.png")
+# The logo is drawn 60pt (~0.83in) tall, so 500px is 600 dpi. Anything larger
+# is invisible in print but still gets hashed on every page and compressed
+# into every PDF.
+_LOGO_MAX_HEIGHT_PX = 500
+
+
+@functools.lru_cache(maxsize=1)
+def _load_logo() -> Optional[ImageReader]:
+    """Decode the logo once, downsampled to at most ``_LOGO_MAX_HEIGHT_PX`` tall.
+
+    Loaded on the first page drawn rather than at import: decoding and
+    resampling the full-size PNG is most of this module's import time, which
+    the GUI pays at startup just to reach the counter helpers.
+    """
+    if not os.path.exists(_LOGO_PATH):
+        return None
+    with PILImage.open(_LOGO_PATH) as img:
+        if img.height > _LOGO_MAX_HEIGHT_PX:
+            width = round(img.width * _LOGO_MAX_HEIGHT_PX / img.height)
+            img = img.resize((width, _LOGO_MAX_HEIGHT_PX), PILImage.LANCZOS)
+        else:
+            img = img.copy()
+    return ImageReader(img)
+
+
+@functools.lru_cache(maxsize=2048)
+def _conn_cell_width(text: str) -> float:
+    """Return the width of a connection table cell in its 10pt font (memoized)."""
+    return pdfmetrics.stringWidth(text, DEFAULT_FONT, 10)
+
+
+def _conn_col_widths(data: list[list[str]]) -> list[float]:
+    """Return the width of each column's widest cell plus a 20pt margin.
+
+    Each distinct cell text is measured once; blanks, labels and repeated
+    catalogue values hit the cache.
+    """
+    return [max(map(_conn_cell_width, column)) + 20 for column in zip(*data)]
+
+
+def _ensure_output_dir(output_dir: Optional[str]) -> str:
+    """Return ``output_dir`` (default 'خروجی'), creating it if it is missing.
+
+    Checked on every call: the folder may be deleted or moved while the GUI
+    is running.
     """
-    # Determine and create output directory if it doesn't exist
     if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
+        output_dir = DEFAULT_OUTPUT_DIR
     os.makedirs(output_dir, exist_ok=True)
-    date_jalali = fetch_current_jalali_date()
-    now = datetime.now().strftime("%d-%m")
-    # Prepare and shape header texts for RTL display
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    # Shape the customer name text for RTL
-    sh_customer_name = str(get_display(reshape(customer_name)))
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    # Helper to draw the logo directly onto the canvas so it doesn't affect flowables
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            # Coordinates origin is at lower‑left; place near top‑left inside page margins
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60  # 60 is the logo height
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    # Add company title to the PDF
-    title_style = ParagraphStyle(
-        name="CompanyTitle",
-        fontName=DEFAULT_FONT,
-        fontSize=18,
-        alignment=TA_CENTER,
-        leading=22
-    )
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
+    return output_dir
+
+
+def _invoice_path(output_dir: Optional[str], invoice_number: str) -> str:
+    """Return the PDF path for ``invoice_number``, creating ``output_dir`` if needed."""
+    return os.path.join(_ensure_output_dir(output_dir), f"{invoice_number}.pdf")
 
-    # Add customer and invoice information
-    header = [
-        ["", sh_date],
-        ["", sh_inv],
-        ["", f"{sh_customer_name}{label_cust}"]
+
+def _build_document(pdf_file: str) -> SimpleDocTemplate:
+    """Return the landscape A4 document template shared by all invoices."""
+    return SimpleDocTemplate(pdf_file, pagesize=PAGE_SIZE, rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
+
+
+def _draw_logo(canvas, doc):
+    """Draw the logo directly onto the canvas so it doesn't affect flowables."""
+    logo = _load_logo()
+    if logo is not None:
+        # Coordinates origin is at lower‑left; place near top‑left inside page margins
+        x = doc.leftMargin
+        y = PAGE_HEIGHT - doc.topMargin - 60  # 60 is the logo height
+        canvas.drawImage(logo, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
+
+
+def _build_prefix_flowables(customer_name: str, invoice_number: str) -> list:
+    """Return the company title and the date/invoice/customer header table."""
+    date_jalali = fetch_current_jalali_date()
+    sh_date = _shape(f"تاریخ: {date_jalali}")
+    sh_inv = _shape(f"شماره پیش‌فاکتور: {invoice_number}")
+    sh_customer_name = _shape(customer_name)
+
+    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{_SH_LABEL_CUST}"]]
+    table = Table(header, colWidths=_HEADER_COL_WIDTHS, style=_HEADER_TABLE_STYLE)
+    return [
+        Paragraph(_SH_COMPANY, _TITLE_STYLE),
+        Spacer(1, 12),
+        table,
+        Spacer(1, 20),
     ]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-    # Build the items table
-    headers_text = ["شماره","قطر (mm)","SDR","گرید","طول (m)","وزن/متر (kg)","وزن کل (kg)","قیمت/kg","قیمت کل (تومان)"]
-    headers = [ str(get_display(reshape(h))) for h in headers_text ]
-    headers = list(reversed(headers))
-    data = [headers]
-    total_price_all = 0.0
-    for idx, itm in enumerate(items, start=1):
-        total_price_all += itm["total_price"]
-        # Ensure grade uses English digits
-        grade_val = itm["pe_grade"]
-        grade_val = digits.fa_to_en(grade_val)
-        row = [
-            str(idx),
-            str(int(itm['diameter'])),
-            str(int(itm['sdr'])),
-            grade_val,
-            f"{itm['length']:.2f}",
-            f"{itm['weight_per_meter']:.3f}",
-            f"{itm['total_weight']:.3f}",
-            f"{int(itm['price_per_kg']):,}",
-            f"{int(itm['total_price']):,}",
-        ]
-        data.append(list(reversed(row)))
-    # Add total price row
-    sh_total_label = str(get_display(reshape("جمع کل:")))
-    sh_total_price = str(get_display(reshape(f"{int(total_price_all):,}")))
-    total_row = ["", "", "", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-    tbl = Table(data, repeatRows=1, colWidths=[100,60,60,60,50,50,30,60,40])
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 9),
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('BACKGROUND', (0,-1), (1,-1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
 
-    # Add explanation text if provided
+
+def _append_explanation(elements: list, explanation_text: Optional[str]):
+    """Append the optional explanation section to the elements list."""
     if explanation_text and explanation_text.strip():
         elements.append(Spacer(1, 24))  # More space before explanation section
+        elements.append(Paragraph(_SH_EXPLANATION_LABEL, _EXPLANATION_LABEL_STYLE))
+        elements.append(Paragraph(_shape(explanation_text), _EXPLANATION_TEXT_STYLE))
+        elements.append(Spacer(1, 12))
 
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
 
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
+def _custom_discount_amount(total: float, discount: float) -> float:
+    """Treat ``discount`` as a percentage of ``total`` if <= 100, else as an absolute amount."""
+    if discount <= 100:
+        return total * (discount / 100.0)
+    return discount
 
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
+
+def _build_invoice_pdf(
+    customer_name: str,
+    invoice_number: str,
+    rows: list[list[str]],
+    footer: list[tuple[str, float]],
+    col_widths: tuple,
+    style: TableStyle,
+    output_dir: Optional[str] = None,
+    explanation_text: Optional[str] = None,
+) -> str:
+    """Build a pipe invoice PDF and return its path.
+
+    ``rows`` come from ``_build_item_rows``; ``footer`` is the list of
+    (shaped label, amount) rows below the items, the last one being the
+    final total that is also written out in words.
+    """
+    pdf_file = _invoice_path(output_dir, invoice_number)
+    doc = _build_document(pdf_file)
+    elements = _build_prefix_flowables(customer_name, invoice_number)
+
+    # Build the items table
+    data = [list(_SH_HEADERS_REV)]
+    data.extend(rows)
+    data.extend([f"{int(amount):,}", label, *_ITEM_FOOTER_BLANKS] for label, amount in footer)
+    tbl = Table(data, repeatRows=1, colWidths=col_widths, rowHeights=_ITEM_ROW_HEIGHT, style=style)
+    elements.append(tbl)
+
+    _append_explanation(elements, explanation_text)
 
     # Write total amount in words
-    append_total_words(elements, total_price_all)
+    append_total_words(elements, footer[-1][1])
 
     # Generate PDF with logo on pages
     doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
     # Invoice counter is managed by the GUI application
+    return pdf_file
+
+
+def generate_pdf(customer_name: str, invoice_number: str, items: list[dict], output_dir: Optional[str] = None, explanation_text: Optional[str] = None):
+    """
+    Generates a PDF invoice for a customer.
+
+    Args:
+        customer_name (str): The name of the customer.
+        invoice_number (str): The invoice number.
+        items (list[dict]): A list of item dictionaries with invoice details.
+        output_dir (str, optional): Path to the directory where the PDF will be saved. Defaults to None, which uses the module's 'خروجی' directory.
+        explanation_text (str, optional): Additional explanation text to include in the PDF.
+    """
+    rows, total_price_all = _build_item_rows(items)
+    pdf_file = _build_invoice_pdf(
+        customer_name, invoice_number, rows,
+        [(_SH_TOTAL_LABEL, total_price_all)],
+        _ITEM_COL_WIDTHS, _ITEM_TABLE_STYLES[1], output_dir, explanation_text,
+    )
     print(f"Invoice PDF saved to: {pdf_file}")
     return pdf_file
 
+
 def generate_pdf_with_added_value(
     customer_name: str, invoice_number: str, items: list[dict],
     output_dir: Optional[str] = None,
@@ -243,130 +562,13 @@ def generate_pdf_with_added_value(
     """
     Generates a PDF invoice for a customer with 10% added value applied.
     """
-    # Determine output directory
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Dates and header shaping
-    date_jalali = fetch_current_jalali_date()
-    now = datetime.now().strftime("%d-%m")
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    # Safe filename
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-
-    # Document setup
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    # Build flowables
-    elements = []
-    title_style = ParagraphStyle(name="CompanyTitle", fontName=DEFAULT_FONT, fontSize=18, alignment=TA_CENTER, leading=22)
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-
-    # Customer and invoice info table
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Item table headers
-    headers_text = ["شماره","قطر (mm)","SDR","گرید","طول (m)","وزن/متر (kg)","وزن کل (kg)","قیمت/kg","قیمت کل (تومان)"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    # Populate items and compute total
-    total_price_all = 0.0
-    for idx, itm in enumerate(items, start=1):
-        total_price_all += itm["total_price"]
-        # Ensure grade uses English digits
-        grade_val = itm["pe_grade"]
-        grade_val = digits.fa_to_en(grade_val)
-        row = [
-            str(idx),
-            str(int(itm['diameter'])),
-            str(int(itm['sdr'])),
-            grade_val,
-            f"{itm['length']:.2f}",
-            f"{itm['weight_per_meter']:.3f}",
-            f"{itm['total_weight']:.3f}",
-            f"{int(itm['price_per_kg']):,}",
-            f"{int(itm['total_price']):,}",
-        ]
-        data.append(list(reversed(row)))
-
-    # Calculate and add value-added row (10%)
+    rows, total_price_all = _build_item_rows(items)
     added_value = total_price_all * 0.10
-    sh_added_label = str(get_display(reshape("مالیات بر ارزش افزوده:")))
-    sh_added_value = str(get_display(reshape(f"{int(added_value):,}")))
-    added_row = ["", "", "", "", "", "", "", sh_added_label, sh_added_value]
-    data.append(list(reversed(added_row)))
-
-    # Final total including added value
-    final_total = total_price_all + added_value
-    sh_total_label = str(get_display(reshape("جمع کل:")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    # Create table with styles
-    tbl = Table(data, repeatRows=1, colWidths=[100, 100, 60, 60, 50, 50, 30, 60, 40])
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 9),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        # Highlight only the added-value label and its number
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        # Highlight only the total label and its number
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
-
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
-    
-    # Write total in words
-    append_total_words(elements, final_total)
-
-    # Build PDF
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
-    # Invoice counter is managed by the GUI application
+    pdf_file = _build_invoice_pdf(
+        customer_name, invoice_number, rows,
+        [(_SH_ADDED_LABEL, added_value), (_SH_TOTAL_LABEL, total_price_all + added_value)],
+        _ITEM_COL_WIDTHS_ADDED, _ITEM_TABLE_STYLE_ADDED, output_dir, explanation_text,
+    )
     print(f"Invoice PDF with added value saved to: {pdf_file}")
     return pdf_file
 
@@ -381,152 +583,13 @@ def generate_pdf_with_discount(
     """
     Generates a PDF invoice for a customer with tiered discounts applied.
     """
-    # Determine output directory
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Dates and header shaping
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    # Safe filename
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-
-    # Document setup
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    # Build flowables
-    elements = []
-    title_style = ParagraphStyle(name="CompanyTitle", fontName=DEFAULT_FONT, fontSize=18, alignment=TA_CENTER, leading=22)
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-    # Header table
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Item table headers
-    headers_text = ["شماره","قطر (mm)","SDR","گرید","طول (m)","وزن/متر (kg)","وزن کل (kg)","قیمت/kg","قیمت کل (تومان)"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    # Populate items and compute total
-    total_price_all = 0.0
-    for idx, itm in enumerate(items, start=1):
-        total_price_all += itm["total_price"]
-        grade_val = digits.fa_to_en(itm["pe_grade"])
-        row = [
-            str(idx),
-            str(int(itm['diameter'])),
-            str(int(itm['sdr'])),
-            grade_val,
-            f"{itm['length']:.2f}",
-            f"{itm['weight_per_meter']:.3f}",
-            f"{itm['total_weight']:.3f}",
-            f"{int(itm['price_per_kg']):,}",
-            f"{int(itm['total_price']):,}",
-        ]
-        data.append(list(reversed(row)))
-
-    # Load discount thresholds
-    base_dir = os.path.dirname(__file__)
-    discount_csv_path = os.path.join(base_dir, "program files", "discount.csv")
-    thresholds = []
-    if os.path.exists(discount_csv_path):
-        with open(discount_csv_path, newline='') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) >= 2:
-                    try:
-                        thresholds.append((float(row[0]), float(row[1])))
-                    except ValueError:
-                        continue
-    thresholds.sort(key=lambda x: x[0])
-    thresholds.insert(0, (0.0, 0.0))  # zero-threshold for no discount below first step
-
-    # Calculate tiered discount amount
-    discount_amount = 0.0
-    for i in range(len(thresholds)):
-        min_price, pct = thresholds[i]
-        next_price = thresholds[i+1][0] if i+1 < len(thresholds) else total_price_all
-        if total_price_all > min_price:
-            segment = min(total_price_all, next_price) - min_price
-        else:
-            segment = 0.0
-        discount_amount += segment * (pct / 100.0)
-
-    # Add discount row
-    sh_discount_label = str(get_display(reshape("تخفیف :")))
-    sh_discount_value = str(get_display(reshape(f"{int(discount_amount):,}")))
-    discount_row = ["", "", "", "", "", "", "", sh_discount_label, sh_discount_value]
-    data.append(list(reversed(discount_row)))
-
-    # Final total after discount
-    final_total = total_price_all - discount_amount
-    sh_total_label = str(get_display(reshape("جمع کل :")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    # Table styling
-    tbl = Table(data, repeatRows=1, colWidths=[100,60,60,60,50,50,30,60,40])
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 9),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('ALIGN',    (1, -2), (1, -2), 'LEFT'),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN',    (1, -1), (1, -1), 'LEFT'),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
-
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
-
-    # Write total in words
-    append_total_words(elements, final_total)
-
-    # Build PDF
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
-    # Invoice counter is managed by the GUI application
+    rows, total_price_all = _build_item_rows(items)
+    discount_amount = _tiered_discount(total_price_all, _get_thresholds())
+    pdf_file = _build_invoice_pdf(
+        customer_name, invoice_number, rows,
+        [(_SH_DISCOUNT_LABEL, discount_amount), (_SH_TOTAL_LABEL_SPACED, total_price_all - discount_amount)],
+        _ITEM_COL_WIDTHS, _ITEM_TABLE_STYLES[2], output_dir, explanation_text,
+    )
     print(f"Invoice PDF with discount saved to: {pdf_file}")
     return pdf_file
 
@@ -542,132 +605,32 @@ def generate_pdf_with_custom_discount(
     Generates a PDF invoice for a customer applying a custom discount.
     If discount is <= 100, treat it as a percentage; if > 100, treat it as an absolute amount.
     """
-    # Determine output directory
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Dates and header shaping
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    # Safe filename
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-
-    # Document setup
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    title_style = ParagraphStyle(name="CompanyTitle", fontName=DEFAULT_FONT, fontSize=18, alignment=TA_CENTER, leading=22)
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-
-    # Customer and invoice info
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Item table headers
-    headers_text = ["شماره","قطر (mm)","SDR","گرید","طول (m)","وزن/متر (kg)","وزن کل (kg)","قیمت/kg","قیمت کل (تومان)"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    # Populate items and compute total
-    total_price_all = 0.0
-    for idx, itm in enumerate(items, start=1):
-        total_price_all += itm["total_price"]
-        grade_val = digits.fa_to_en(itm["pe_grade"])
-        row = [
-            str(idx),
-            str(int(itm['diameter'])),
-            str(int(itm['sdr'])),
-            grade_val,
-            f"{itm['length']:.2f}",
-            f"{itm['weight_per_meter']:.3f}",
-            f"{itm['total_weight']:.3f}",
-            f"{int(itm['price_per_kg']):,}",
-            f"{int(itm['total_price']):,}",
-        ]
-        data.append(list(reversed(row)))
-
-    # Determine discount amount
-    if discount <= 100:
-        discount_amount = total_price_all * (discount / 100.0)
-    else:
-        discount_amount = discount
-
-    # Add discount row
-    sh_discount_label = str(get_display(reshape("تخفیف :")))
-    sh_discount_value = str(get_display(reshape(f"{int(discount_amount):,}")))
-    discount_row = ["", "", "", "", "", "", "", sh_discount_label, sh_discount_value]
-    data.append(list(reversed(discount_row)))
-
-    # Final total after discount
-    final_total = total_price_all - discount_amount
-    sh_total_label = str(get_display(reshape("جمع کل :")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    # Create table with styles
-    tbl = Table(data, repeatRows=1, colWidths=[100,60,60,60,50,50,30,60,40])
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 9),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('ALIGN', (1, -2), (1, -2), 'LEFT'),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, -1), (1, -1), 'LEFT'),
-    ]))
-    elements.append(tbl)
+    rows, total_price_all = _build_item_rows(items)
+    discount_amount = _custom_discount_amount(total_price_all, discount)
+    pdf_file = _build_invoice_pdf(
+        customer_name, invoice_number, rows,
+        [(_SH_DISCOUNT_LABEL, discount_amount), (_SH_TOTAL_LABEL_SPACED, total_price_all - discount_amount)],
+        _ITEM_COL_WIDTHS, _ITEM_TABLE_STYLES[2], output_dir, explanation_text,
+    )
+    print(f"Invoice PDF with custom discount saved to: {pdf_file}")
+    return pdf_file
 
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
 
-    # Write total in words
-    append_total_words(elements, final_total)
+def _discount_and_added_value_footer(
+    total: float, discount_amount: float, labels: tuple[str, str, str]
+) -> list[tuple[str, float]]:
+    """Footer rows for a discount followed by 10% added value on the net amount.
 
-    # Build PDF
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
-    # Invoice counter is managed by the GUI application
-    print(f"Invoice PDF with custom discount saved to: {pdf_file}")
-    return pdf_file
+    ``labels`` are the shaped (discount, added value, total) labels.
+    """
+    discount_label, added_label, total_label = labels
+    net_amount = total - discount_amount
+    added_value_amount = net_amount * 0.10
+    return [
+        (discount_label, discount_amount),
+        (added_label, added_value_amount),
+        (total_label, net_amount + added_value_amount),
+    ]
 
 
 def generate_pdf_with_discount_and_added_value(
@@ -680,164 +643,13 @@ def generate_pdf_with_discount_and_added_value(
     """
     Generates a PDF invoice for a customer with tiered discounts and 10% added-value applied on the net amount.
     """
-    # Determine output directory
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Dates and header shaping
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    # Safe filename
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-
-    # Document setup
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    # Build flowables
-    elements = []
-    title_style = ParagraphStyle(name="CompanyTitle", fontName=DEFAULT_FONT, fontSize=18, alignment=TA_CENTER, leading=22)
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Item table headers
-    headers_text = ["شماره","قطر (mm)","SDR","گرید","طول (m)","وزن/متر (kg)","وزن کل (kg)","قیمت/kg","قیمت کل (تومان)"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    # Populate items and compute total
-    total_price_all = 0.0
-    for idx, itm in enumerate(items, start=1):
-        total_price_all += itm["total_price"]
-        grade_val = digits.fa_to_en(itm["pe_grade"])
-        row = [
-            str(idx),
-            str(int(itm['diameter'])),
-            str(int(itm['sdr'])),
-            grade_val,
-            f"{itm['length']:.2f}",
-            f"{itm['weight_per_meter']:.3f}",
-            f"{itm['total_weight']:.3f}",
-            f"{int(itm['price_per_kg']):,}",
-            f"{int(itm['total_price']):,}",
-        ]
-        data.append(list(reversed(row)))
-
-    # Load discount thresholds
-    base_dir = os.path.dirname(__file__)
-    discount_csv_path = os.path.join(base_dir, "program files", "discount.csv")
-    thresholds = []
-    if os.path.exists(discount_csv_path):
-        with open(discount_csv_path, newline='') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) >= 2:
-                    try:
-                        thresholds.append((float(row[0]), float(row[1])))
-                    except ValueError:
-                        continue
-    thresholds.sort(key=lambda x: x[0])
-    thresholds.insert(0, (0.0, 0.0))
-
-    # Calculate tiered discount amount
-    discount_amount = 0.0
-    for i in range(len(thresholds)):
-        min_price, pct = thresholds[i]
-        next_price = thresholds[i+1][0] if i+1 < len(thresholds) else total_price_all
-        if total_price_all > min_price:
-            segment = min(total_price_all, next_price) - min_price
-        else:
-            segment = 0.0
-        discount_amount += segment * (pct / 100.0)
-
-    # Add discount row
-    sh_discount_label = str(get_display(reshape("تخفیف :")))
-    sh_discount_value = str(get_display(reshape(f"{int(discount_amount):,}")))
-    discount_row = ["", "", "", "", "", "", "", sh_discount_label, sh_discount_value]
-    data.append(list(reversed(discount_row)))
-
-    # Net amount after discount
-    net_amount = total_price_all - discount_amount
-
-    # Calculate added-value (10% on net amount)
-    added_value_amount = net_amount * 0.10
-
-    # Add added-value row
-    sh_added_label = str(get_display(reshape("مالیات بر ارزش افزوده :")))
-    sh_added_value = str(get_display(reshape(f"{int(added_value_amount):,}")))
-    added_row = ["", "", "", "", "", "", "", sh_added_label, sh_added_value]
-    data.append(list(reversed(added_row)))
-
-    # Final total after discount and added value
-    final_total = net_amount + added_value_amount
-    sh_total_label = str(get_display(reshape("جمع کل :")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    # Table styling
-    tbl = Table(data, repeatRows=1, colWidths=[100,105,60,60,50,50,30,60,40])
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 9),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -3), (1, -3), colors.lightgrey),
-        ('ALIGN', (1, -3), (1, -3), 'LEFT'),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('ALIGN',    (1, -2), (1, -2), 'LEFT'),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
-
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
-
-    # Write total in words
-    append_total_words(elements, final_total)
-
-    # Build PDF
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
-    # Invoice counter is managed by the GUI application
+    rows, total_price_all = _build_item_rows(items)
+    discount_amount = _tiered_discount(total_price_all, _get_thresholds())
+    pdf_file = _build_invoice_pdf(
+        customer_name, invoice_number, rows,
+        _discount_and_added_value_footer(total_price_all, discount_amount, _ITEM_DISCOUNT_ADDED_LABELS),
+        _ITEM_COL_WIDTHS_DISCOUNT_ADDED, _ITEM_TABLE_STYLES[3], output_dir, explanation_text,
+    )
     print(f"Invoice PDF with discount and added value saved to: {pdf_file}")
     return pdf_file
 
@@ -852,128 +664,13 @@ def generate_pdf_with_custom_discount_and_added_value(
     """
     Generates a PDF invoice applying a custom discount (percentage if <=100, absolute if >100) and then adds 10% added-value on the net amount.
     """
-    # Determine output directory
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Dates and header shaping
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    # Safe filename and document setup
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    title_style = ParagraphStyle(name="CompanyTitle", fontName=DEFAULT_FONT, fontSize=18, alignment=TA_CENTER, leading=22)
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-
-    # Customer and invoice info
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Populate items and compute total
-    headers_text = ["شماره","قطر (mm)","SDR","گرید","طول (m)","وزن/متر (kg)","وزن کل (kg)","قیمت/kg","قیمت کل (تومان)"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-    total_price_all = 0.0
-    for idx, itm in enumerate(items, start=1):
-        total_price_all += itm["total_price"]
-        grade_val = digits.fa_to_en(itm["pe_grade"])
-        row = [
-            str(idx), str(int(itm['diameter'])), str(int(itm['sdr'])), grade_val,
-            f"{itm['length']:.2f}", f"{itm['weight_per_meter']:.3f}", f"{itm['total_weight']:.3f}",
-            f"{int(itm['price_per_kg']):,}", f"{int(itm['total_price']):,}" ]
-        data.append(list(reversed(row)))
-
-    # Determine discount amount
-    if discount <= 100:
-        discount_amount = total_price_all * (discount / 100.0)
-    else:
-        discount_amount = discount
-
-    # Add discount row
-    sh_discount_label = str(get_display(reshape("تخفیف :")))
-    sh_discount_value = str(get_display(reshape(f"{int(discount_amount):,}")))
-    discount_row = ["", "", "", "", "", "", "", sh_discount_label, sh_discount_value]
-    data.append(list(reversed(discount_row)))
-
-    # Net amount after discount and 10% added-value
-    net_amount = total_price_all - discount_amount
-    added_value_amount = net_amount * 0.10
-    sh_added_label = str(get_display(reshape("مالیات بر ارزش افزوده :")))
-    sh_added_value = str(get_display(reshape(f"{int(added_value_amount):,}")))
-    added_row = ["", "", "", "", "", "", "", sh_added_label, sh_added_value]
-    data.append(list(reversed(added_row)))
-
-    # Final total
-    final_total = net_amount + added_value_amount
-    sh_total_label = str(get_display(reshape("جمع کل :")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    tbl = Table(data, repeatRows=1, colWidths=[100,105,60,60,50,50,30,60,40])
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 9),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -3), (1, -3), colors.lightgrey),
-        ('ALIGN',  (1, -3), (1, -3), 'LEFT'),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('ALIGN',  (1, -2), (1, -2), 'LEFT'),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN',  (1, -1), (1, -1), 'LEFT'),
-    ]))
-    elements.append(tbl)
-
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
-
-    # Write total in words
-    append_total_words(elements, final_total)
-
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
-
-    # Invoice counter is managed by the GUI application
+    rows, total_price_all = _build_item_rows(items)
+    discount_amount = _custom_discount_amount(total_price_all, discount)
+    pdf_file = _build_invoice_pdf(
+        customer_name, invoice_number, rows,
+        _discount_and_added_value_footer(total_price_all, discount_amount, _ITEM_DISCOUNT_ADDED_LABELS),
+        _ITEM_COL_WIDTHS_DISCOUNT_ADDED, _ITEM_TABLE_STYLES[3], output_dir, explanation_text,
+    )
     print(f"Invoice PDF with custom discount and added value saved to: {pdf_file}")
     return pdf_file
 
@@ -1019,157 +716,70 @@ if __name__ == "__main__":
     main()
 
 
-def generate_connection_invoice_pdf(
+def _build_connection_invoice_pdf(
     customer_name: str,
     invoice_number: str,
     items: list[dict],
+    footer: list[tuple[str, float]],
     output_dir: Optional[str] = None,
-    explanation_text: Optional[str] = None
-):
-    """
-    Generates a PDF invoice for connection items (اتصالات), with columns:
-    نوع اتصال | محصول | سایز | تعداد | قیمت واحد | قیمت کل
-    All headers are in Persian, RTL-shaped.
-    """
-    # Determine output directory
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
+    explanation_text: Optional[str] = None,
+) -> str:
+    """Build a connection invoice PDF and return its path.
 
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    title_style = ParagraphStyle(
-        name="CompanyTitle",
-        fontName=DEFAULT_FONT,
-        fontSize=18,
-        alignment=TA_CENTER,
-        leading=22
-    )
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-
-    # Customer and invoice info table
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Table headers: نوع اتصال | محصول | فشار قابل تحمل | سایز | تعداد | قیمت واحد | قیمت کل (RTL order, so reverse for display)
-    headers_text = ["نوع اتصال", "محصول", "فشار قابل تحمل", "سایز", "تعداد", "قیمت واحد", "قیمت کل"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    total_price_all = 0.0
-    for itm in items:
-        # All values as string, prices as Persian digits with thousands separator
-        type_val   = str(get_display(reshape(str(itm.get("type", "")))))
-        product_val = str(get_display(reshape(str(itm.get("product", "")))))
-        pn_val = str(get_display(reshape(str(itm.get("pn", "")))))
-        size_val   = str(get_display(reshape(str(itm.get("size", "")))))
-        quantity = itm.get("quantity", 1)
-        quantity_val = str(get_display(reshape(str(int(quantity)))))
-        unit_price = itm.get("unit_price", 0)
-        total_price = itm.get("total_price", 0)
-        total_price_all += total_price
-        unit_price_str = str(get_display(reshape(f"{int(unit_price):,}")))
-        total_price_str = str(get_display(reshape(f"{int(total_price):,}")))
-        # Order: type, product, pn, size, quantity, unit_price, total_price
-        row = [
-            type_val,
-            product_val,
-            pn_val,
-            size_val,
-            quantity_val,
-            unit_price_str,
-            total_price_str,
-        ]
-        data.append(list(reversed(row)))
-
-    # Add total row (align with new columns: [نوع اتصال, محصول, فشار قابل تحمل, سایز, تعداد, قیمت واحد, قیمت کل])
-    sh_total_label = str(get_display(reshape("جمع کل")))
-    sh_total_price = str(get_display(reshape(f"{int(total_price_all):,}")))
-    total_row = ["", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    # --- Dynamically calculate column widths for all columns ---
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-
-    col_font = DEFAULT_FONT
-    col_font_size = 10
+    ``footer`` is the list of (shaped label, amount) rows below the items,
+    the last one being the final total that is also written out in words.
+    Columns are sized to their widest cell.
+    """
+    pdf_file = _invoice_path(output_dir, invoice_number)
+    doc = _build_document(pdf_file)
+    elements = _build_prefix_flowables(customer_name, invoice_number)
 
-    # `data` already contains all rows (header, items, total) in display order: [قیمت کل, قیمت واحد, سایز, محصول, نوع اتصال]
-    num_cols = len(data[0])
-    col_widths = []
-    for idx in range(num_cols):
-        max_w = max(stringWidth(str(row[idx]), col_font, col_font_size) for row in data)
-        col_widths.append(max_w + 20)  # add small margin
+    data = [list(_SH_CONN_HEADERS_REV)]
+    data.extend(_conn_item_rows(items))
+    data.extend([f"{int(amount):,}", label, *_CONN_FOOTER_BLANKS] for label, amount in footer)
 
-    # Create the table with auto-sized columns
     tbl = Table(
-        data,
-        repeatRows=1,
-        colWidths=col_widths
+        data, repeatRows=1, colWidths=_conn_col_widths(data), rowHeights=_CONN_ROW_HEIGHT,
+        style=_CONN_TABLE_STYLES[len(footer)],
     )
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 10),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
     elements.append(tbl)
 
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
+    _append_explanation(elements, explanation_text)
 
     # Write total in words
-    append_total_words(elements, total_price_all)
+    append_total_words(elements, footer[-1][1])
 
     doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
+    return pdf_file
+
+
+def _conn_items_total(items: list[dict]) -> float:
+    """Return the sum of the connection items' total prices."""
+    return sum((itm.get("total_price", 0) for itm in items), 0.0)
+
+
+def generate_connection_invoice_pdf(
+    customer_name: str,
+    invoice_number: str,
+    items: list[dict],
+    output_dir: Optional[str] = None,
+    explanation_text: Optional[str] = None
+):
+    """
+    Generates a PDF invoice for connection items (اتصالات), with columns:
+    نوع اتصال | محصول | سایز | تعداد | قیمت واحد | قیمت کل
+    All headers are in Persian, RTL-shaped.
+    """
+    total_price_all = _conn_items_total(items)
+    pdf_file = _build_connection_invoice_pdf(
+        customer_name, invoice_number, items,
+        [(_SH_CONN_TOTAL_LABEL, total_price_all)],
+        output_dir, explanation_text,
+    )
     print(f"Connection invoice PDF saved to: {pdf_file}")
-    return pdf_file  
+    return pdf_file
 
 
-# --- New function: generate_connection_invoice_pdf_with_added_value ---
 def generate_connection_invoice_pdf_with_added_value(
     customer_name: str,
     invoice_number: str,
@@ -1181,154 +791,17 @@ def generate_connection_invoice_pdf_with_added_value(
     Generates a PDF invoice for connection items with 10% added value applied.
     Columns: نوع اتصال | محصول | سایز | تعداد | قیمت واحد | قیمت کل
     """
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    from bidi.algorithm import get_display
-    from arabic_reshaper import reshape
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-    from persiantools import digits
-    from khayyam import JalaliDate
-
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    title_style = ParagraphStyle(
-        name="CompanyTitle",
-        fontName=DEFAULT_FONT,
-        fontSize=18,
-        alignment=TA_CENTER,
-        leading=22
-    )
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    headers_text = ["نوع اتصال", "محصول", "فشار قابل تحمل", "سایز", "تعداد", "قیمت واحد", "قیمت کل"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    total_price_all = 0.0
-    for itm in items:
-        type_val   = str(get_display(reshape(str(itm.get("type", "")))))
-        product_val = str(get_display(reshape(str(itm.get("product", "")))))
-        pn_val = str(get_display(reshape(str(itm.get("pn", "")))))
-        size_val   = str(get_display(reshape(str(itm.get("size", "")))))
-        quantity = itm.get("quantity", 1)
-        quantity_val = str(get_display(reshape(str(int(quantity)))))
-        unit_price = itm.get("unit_price", 0)
-        total_price = itm.get("total_price", 0)
-        total_price_all += total_price
-        unit_price_str = str(get_display(reshape(f"{int(unit_price):,}")))
-        total_price_str = str(get_display(reshape(f"{int(total_price):,}")))
-        row = [
-            type_val,
-            product_val,
-            pn_val,
-            size_val,
-            quantity_val,
-            unit_price_str,
-            total_price_str,
-        ]
-        data.append(list(reversed(row)))
-
-    # Add 10% added value row
+    total_price_all = _conn_items_total(items)
     added_value = total_price_all * 0.10
-    sh_added_label = str(get_display(reshape("مالیات بر ارزش افزوده")))
-    sh_added_value = str(get_display(reshape(f"{int(added_value):,}")))
-    added_row = ["", "", "", "", "", sh_added_label, sh_added_value]
-    data.append(list(reversed(added_row)))
-
-    # Final total including added value
-    final_total = total_price_all + added_value
-    sh_total_label = str(get_display(reshape("جمع کل")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    col_font = DEFAULT_FONT
-    col_font_size = 10
-    num_cols = len(data[0])
-    col_widths = []
-    for idx in range(num_cols):
-        max_w = max(stringWidth(str(row[idx]), col_font, col_font_size) for row in data)
-        col_widths.append(max_w + 20)
-
-    tbl = Table(
-        data,
-        repeatRows=1,
-        colWidths=col_widths
+    pdf_file = _build_connection_invoice_pdf(
+        customer_name, invoice_number, items,
+        [(_SH_CONN_ADDED_LABEL, added_value), (_SH_CONN_TOTAL_LABEL, total_price_all + added_value)],
+        output_dir, explanation_text,
     )
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 10),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
-
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
-
-    # Write total in words
-    append_total_words(elements, final_total)
-
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
     print(f"Connection invoice PDF with added value saved to: {pdf_file}")
     return pdf_file
 
 
-# --- New function: generate_connection_invoice_pdf_with_discount ---
 def generate_connection_invoice_pdf_with_discount(
     customer_name: str,
     invoice_number: str,
@@ -1341,179 +814,17 @@ def generate_connection_invoice_pdf_with_discount(
     Columns: نوع اتصال | محصول | سایز | تعداد | قیمت واحد | قیمت کل
     Discount tiers loaded from discount.csv in program files.
     """
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    from bidi.algorithm import get_display
-    from arabic_reshaper import reshape
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-    from persiantools import digits
-    from khayyam import JalaliDate
-    import csv
-
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    title_style = ParagraphStyle(
-        name="CompanyTitle",
-        fontName=DEFAULT_FONT,
-        fontSize=18,
-        alignment=TA_CENTER,
-        leading=22
-    )
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    headers_text = ["نوع اتصال", "محصول", "فشار قابل تحمل", "سایز", "تعداد", "قیمت واحد", "قیمت کل"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    total_price_all = 0.0
-    for itm in items:
-        type_val   = str(get_display(reshape(str(itm.get("type", "")))))
-        product_val = str(get_display(reshape(str(itm.get("product", "")))))
-        pn_val = str(get_display(reshape(str(itm.get("pn", "")))))
-        size_val   = str(get_display(reshape(str(itm.get("size", "")))))
-        quantity = itm.get("quantity", 1)
-        quantity_val = str(get_display(reshape(str(int(quantity)))))
-        unit_price = itm.get("unit_price", 0)
-        total_price = itm.get("total_price", 0)
-        total_price_all += total_price
-        unit_price_str = str(get_display(reshape(f"{int(unit_price):,}")))
-        total_price_str = str(get_display(reshape(f"{int(total_price):,}")))
-        row = [
-            type_val,
-            product_val,
-            pn_val,
-            size_val,
-            quantity_val,
-            unit_price_str,
-            total_price_str,
-        ]
-        data.append(list(reversed(row)))
-
-    # --- Discount calculation using discount.csv ---
-    discount_csv_path = os.path.join(DEPENDENCIES_DIR, "discount.csv")
-    thresholds = []
-    if os.path.exists(discount_csv_path):
-        with open(discount_csv_path, newline='') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) >= 2:
-                    try:
-                        thresholds.append((float(row[0]), float(row[1])))
-                    except ValueError:
-                        continue
-    thresholds.sort(key=lambda x: x[0])
-    thresholds.insert(0, (0.0, 0.0))  # for no discount below first threshold
-
-    # Calculate tiered discount
-    discount_amount = 0.0
-    for i in range(len(thresholds)):
-        min_price, pct = thresholds[i]
-        next_price = thresholds[i+1][0] if i+1 < len(thresholds) else total_price_all
-        if total_price_all > min_price:
-            segment = min(total_price_all, next_price) - min_price
-        else:
-            segment = 0.0
-        discount_amount += segment * (pct / 100.0)
-
-    sh_discount_label = str(get_display(reshape("تخفیف")))
-    sh_discount_value = str(get_display(reshape(f"{int(discount_amount):,}")))
-    discount_row = ["", "", "", "", "", sh_discount_label, sh_discount_value]
-    data.append(list(reversed(discount_row)))
-
-    # Final total after discount
-    final_total = total_price_all - discount_amount
-    sh_total_label = str(get_display(reshape("جمع کل")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    col_font = DEFAULT_FONT
-    col_font_size = 10
-    num_cols = len(data[0])
-    col_widths = []
-    for idx in range(num_cols):
-        max_w = max(stringWidth(str(row[idx]), col_font, col_font_size) for row in data)
-        col_widths.append(max_w + 20)
-
-    tbl = Table(
-        data,
-        repeatRows=1,
-        colWidths=col_widths
+    total_price_all = _conn_items_total(items)
+    discount_amount = _tiered_discount(total_price_all, _get_thresholds())
+    pdf_file = _build_connection_invoice_pdf(
+        customer_name, invoice_number, items,
+        [(_SH_CONN_DISCOUNT_LABEL, discount_amount), (_SH_CONN_TOTAL_LABEL, total_price_all - discount_amount)],
+        output_dir, explanation_text,
     )
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 10),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
-
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
-
-    # Write total in words
-    append_total_words(elements, final_total)
-
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
     print(f"Connection invoice PDF with discount saved to: {pdf_file}")
     return pdf_file
 
 
-# --- New function: generate_connection_invoice_pdf_with_custom_discount ---
 def generate_connection_invoice_pdf_with_custom_discount(
     customer_name: str,
     invoice_number: str,
@@ -1527,160 +838,17 @@ def generate_connection_invoice_pdf_with_custom_discount(
     If discount is <= 100, treat as percent; if > 100, treat as absolute amount.
     Columns: نوع اتصال | محصول | سایز | تعداد | قیمت واحد | قیمت کل
     """
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    from bidi.algorithm import get_display
-    from arabic_reshaper import reshape
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-    from persiantools import digits
-    from khayyam import JalaliDate
-
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    title_style = ParagraphStyle(
-        name="CompanyTitle",
-        fontName=DEFAULT_FONT,
-        fontSize=18,
-        alignment=TA_CENTER,
-        leading=22
-    )
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Updated headers: add "فشار قابل تحمل"
-    headers_text = ["نوع اتصال", "محصول", "فشار قابل تحمل", "سایز", "تعداد", "قیمت واحد", "قیمت کل"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    total_price_all = 0.0
-    for itm in items:
-        type_val   = str(get_display(reshape(str(itm.get("type", "")))))
-        product_val = str(get_display(reshape(str(itm.get("product", "")))))
-        pn_val = str(get_display(reshape(str(itm.get("pn", "")))))
-        size_val   = str(get_display(reshape(str(itm.get("size", "")))))
-        quantity = itm.get("quantity", 1)
-        quantity_val = str(get_display(reshape(str(int(quantity)))))
-        unit_price = itm.get("unit_price", 0)
-        total_price = itm.get("total_price", 0)
-        total_price_all += total_price
-        unit_price_str = str(get_display(reshape(f"{int(unit_price):,}")))
-        total_price_str = str(get_display(reshape(f"{int(total_price):,}")))
-        # Order: type, product, pn, size, quantity, unit_price, total_price
-        row = [
-            type_val,
-            product_val,
-            pn_val,
-            size_val,
-            quantity_val,
-            unit_price_str,
-            total_price_str,
-        ]
-        data.append(list(reversed(row)))
-
-    # Custom discount
-    if discount <= 100:
-        discount_amount = total_price_all * (discount / 100.0)
-    else:
-        discount_amount = discount
-
-    sh_discount_label = str(get_display(reshape("تخفیف")))
-    sh_discount_value = str(get_display(reshape(f"{int(discount_amount):,}")))
-    discount_row = ["", "", "", "", "", sh_discount_label, sh_discount_value]
-    data.append(list(reversed(discount_row)))
-
-    # Final total after discount
-    final_total = total_price_all - discount_amount
-    sh_total_label = str(get_display(reshape("جمع کل")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    col_font = DEFAULT_FONT
-    col_font_size = 10
-    num_cols = len(data[0])
-    col_widths = []
-    for idx in range(num_cols):
-        max_w = max(stringWidth(str(row[idx]), col_font, col_font_size) for row in data)
-        col_widths.append(max_w + 20)
-
-    tbl = Table(
-        data,
-        repeatRows=1,
-        colWidths=col_widths
+    total_price_all = _conn_items_total(items)
+    discount_amount = _custom_discount_amount(total_price_all, discount)
+    pdf_file = _build_connection_invoice_pdf(
+        customer_name, invoice_number, items,
+        [(_SH_CONN_DISCOUNT_LABEL, discount_amount), (_SH_CONN_TOTAL_LABEL, total_price_all - discount_amount)],
+        output_dir, explanation_text,
     )
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 10),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
-
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
-
-    # Write total in words
-    append_total_words(elements, final_total)
-
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
     print(f"Connection invoice PDF with custom discount saved to: {pdf_file}")
     return pdf_file
 
 
-# --- New function: generate_connection_invoice_pdf_with_discount_and_added_value ---
 def generate_connection_invoice_pdf_with_discount_and_added_value(
     customer_name: str,
     invoice_number: str,
@@ -1693,189 +861,17 @@ def generate_connection_invoice_pdf_with_discount_and_added_value(
     Columns: نوع اتصال | محصول | سایز | تعداد | قیمت واحد | قیمت کل
     Discount tiers loaded from discount.csv in program files.
     """
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    from bidi.algorithm import get_display
-    from arabic_reshaper import reshape
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-    from persiantools import digits
-    from khayyam import JalaliDate
-    import csv
-
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(DEPENDENCIES_DIR, "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = PAGE_HEIGHT - _doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    title_style = ParagraphStyle(
-        name="CompanyTitle",
-        fontName=DEFAULT_FONT,
-        fontSize=18,
-        alignment=TA_CENTER,
-        leading=22
-    )
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
-
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 12),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Updated headers: add "فشار قابل تحمل"
-    headers_text = ["نوع اتصال", "محصول", "فشار قابل تحمل", "سایز", "تعداد", "قیمت واحد", "قیمت کل"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    total_price_all = 0.0
-    for itm in items:
-        type_val   = str(get_display(reshape(str(itm.get("type", "")))))
-        product_val = str(get_display(reshape(str(itm.get("product", "")))))
-        pn_val = str(get_display(reshape(str(itm.get("pn", "")))))
-        size_val   = str(get_display(reshape(str(itm.get("size", "")))))
-        quantity = itm.get("quantity", 1)
-        quantity_val = str(get_display(reshape(str(int(quantity)))))
-        unit_price = itm.get("unit_price", 0)
-        total_price = itm.get("total_price", 0)
-        total_price_all += total_price
-        unit_price_str = str(get_display(reshape(f"{int(unit_price):,}")))
-        total_price_str = str(get_display(reshape(f"{int(total_price):,}")))
-        # Order: type, product, pn, size, quantity, unit_price, total_price
-        row = [
-            type_val,
-            product_val,
-            pn_val,
-            size_val,
-            quantity_val,
-            unit_price_str,
-            total_price_str,
-        ]
-        data.append(list(reversed(row)))
-
-    # --- Discount calculation using discount.csv ---
-    discount_csv_path = os.path.join(DEPENDENCIES_DIR, "discount.csv")
-    thresholds = []
-    if os.path.exists(discount_csv_path):
-        with open(discount_csv_path, newline='') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) >= 2:
-                    try:
-                        thresholds.append((float(row[0]), float(row[1])))
-                    except ValueError:
-                        continue
-    thresholds.sort(key=lambda x: x[0])
-    thresholds.insert(0, (0.0, 0.0))  # for no discount below first threshold
-
-    # Calculate tiered discount
-    discount_amount = 0.0
-    for i in range(len(thresholds)):
-        min_price, pct = thresholds[i]
-        next_price = thresholds[i+1][0] if i+1 < len(thresholds) else total_price_all
-        if total_price_all > min_price:
-            segment = min(total_price_all, next_price) - min_price
-        else:
-            segment = 0.0
-        discount_amount += segment * (pct / 100.0)
-
-    sh_discount_label = str(get_display(reshape("تخفیف")))
-    sh_discount_value = str(get_display(reshape(f"{int(discount_amount):,}")))
-    discount_row = ["", "", "", "", "", sh_discount_label, sh_discount_value]
-    data.append(list(reversed(discount_row)))
-
-    # Net after discount
-    net_after_discount = total_price_all - discount_amount
-
-    # Add 10% added value row on net amount
-    added_value = net_after_discount * 0.10
-    sh_added_label = str(get_display(reshape("مالیات بر ارزش افزوده")))
-    sh_added_value = str(get_display(reshape(f"{int(added_value):,}")))
-    added_row = ["", "", "", "", "", sh_added_label, sh_added_value]
-    data.append(list(reversed(added_row)))
-
-    # Final total including added value
-    final_total = net_after_discount + added_value
-    sh_total_label = str(get_display(reshape("جمع کل")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    col_font = DEFAULT_FONT
-    col_font_size = 10
-    num_cols = len(data[0])
-    col_widths = []
-    for idx in range(num_cols):
-        max_w = max(stringWidth(str(row[idx]), col_font, col_font_size) for row in data)
-        col_widths.append(max_w + 20)
-
-    tbl = Table(
-        data,
-        repeatRows=1,
-        colWidths=col_widths
+    total_price_all = _conn_items_total(items)
+    discount_amount = _tiered_discount(total_price_all, _get_thresholds())
+    pdf_file = _build_connection_invoice_pdf(
+        customer_name, invoice_number, items,
+        _discount_and_added_value_footer(total_price_all, discount_amount, _CONN_DISCOUNT_ADDED_LABELS),
+        output_dir, explanation_text,
     )
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), DEFAULT_FONT, 10),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -3), (1, -3), colors.lightgrey),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
-
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName=DEFAULT_FONT, fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
-
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
     print(f"Connection invoice PDF with discount and added value saved to: {pdf_file}")
     return pdf_file
 
 
-# --- New function: generate_connection_invoice_pdf_with_custom_discount_and_added_value ---
 def generate_connection_invoice_pdf_with_custom_discount_and_added_value(
     customer_name: str,
     invoice_number: str,
@@ -1889,164 +885,112 @@ def generate_connection_invoice_pdf_with_custom_discount_and_added_value(
     and then adds 10% added value tax on the net amount.
     Columns: نوع اتصال | محصول | فشار قابل تحمل | سایز | تعداد | قیمت واحد | قیمت کل
     """
-    if output_dir is None:
-        output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
-    os.makedirs(output_dir, exist_ok=True)
-
-    from bidi.algorithm import get_display
-    from arabic_reshaper import reshape
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-    from persiantools import digits
-    from khayyam import JalaliDate
-
-    date_jalali = fetch_current_jalali_date()
-    sh_company = str(get_display(reshape(COMPANY_NAME)))
-    sh_date    = str(get_display(reshape(f"تاریخ: {date_jalali}")))
-    sh_inv     = str(get_display(reshape(f"شماره پیش‌فاکتور: {invoice_number}")))
-    label_cust = str(get_display(reshape("نام مشتری:")))
-    sh_customer_name = str(get_display(reshape(customer_name)))
-
-    pdf_file = os.path.join(output_dir, f"{invoice_number}.pdf")
-    doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A4), rightMargin=20, leftMargin=20, topMargin=30, bottomMargin=20)
-    logo_path = os.path.join(os.path.dirname(__file__), "program files", "logo.png")
-
-    def _draw_logo(canvas, _doc):
-        if os.path.exists(logo_path):
-            x = _doc.leftMargin
-            y = doc.pagesize[1] - doc.topMargin - 60
-            canvas.drawImage(logo_path, x, y, width=90, height=60, preserveAspectRatio=True, mask='auto')
-
-    elements = []
-    title_style = ParagraphStyle(
-        name="CompanyTitle",
-        fontName="Persian",
-        fontSize=18,
-        alignment=TA_CENTER,
-        leading=22
+    total_price_all = _conn_items_total(items)
+    discount_amount = _custom_discount_amount(total_price_all, discount)
+    pdf_file = _build_connection_invoice_pdf(
+        customer_name, invoice_number, items,
+        _discount_and_added_value_footer(total_price_all, discount_amount, _CONN_DISCOUNT_ADDED_LABELS),
+        output_dir, explanation_text,
     )
-    elements.append(Paragraph(sh_company, title_style))
-    elements.append(Spacer(1, 12))
+    print(f"Connection invoice PDF with custom discount and added value saved to: {pdf_file}")
+    return pdf_file
 
-    header = [["", sh_date], ["", sh_inv], ["", f"{sh_customer_name}{label_cust}"]]
-    table = Table(header, colWidths=[100, 400])
-    table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONT', (0, 0), (-1, -1), "Persian", 12),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    # Updated headers: add "فشار قابل تحمل"
-    headers_text = ["نوع اتصال", "محصول", "فشار قابل تحمل", "سایز", "تعداد", "قیمت واحد", "قیمت کل"]
-    headers = [str(get_display(reshape(h))) for h in headers_text]
-    headers = list(reversed(headers))
-    data = [headers]
-
-    total_price_all = 0.0
-    for itm in items:
-        type_val    = str(get_display(reshape(str(itm.get("type", "")))))
-        product_val = str(get_display(reshape(str(itm.get("product", "")))))
-        pn_val      = str(get_display(reshape(str(itm.get("pn", "")))))
-        size_val    = str(get_display(reshape(str(itm.get("size", "")))))
-        quantity = itm.get("quantity", 1)
-        quantity_val = str(get_display(reshape(str(int(quantity)))))
-        unit_price = itm.get("unit_price", 0)
-        total_price = itm.get("total_price", 0)
-        total_price_all += total_price
-        unit_price_str = str(get_display(reshape(f"{int(unit_price):,}")))
-        total_price_str = str(get_display(reshape(f"{int(total_price):,}")))
-        row = [
-            type_val,
-            product_val,
-            pn_val,
-            size_val,
-            quantity_val,
-            unit_price_str,
-            total_price_str,
-        ]
-        data.append(list(reversed(row)))
 
-    # Determine custom discount amount
-    if discount <= 100:
-        discount_amount = total_price_all * (discount / 100.0)
-    else:
-        discount_amount = discount
-
-    sh_discount_label = str(get_display(reshape("تخفیف")))
-    sh_discount_value = str(get_display(reshape(f"{int(discount_amount):,}")))
-    discount_row = ["", "", "", "", "", sh_discount_label, sh_discount_value]
-    data.append(list(reversed(discount_row)))
-
-    # Net after discount
-    net_after_discount = total_price_all - discount_amount
-
-    # Add 10% added value row on net amount
-    added_value = net_after_discount * 0.10
-    sh_added_label = str(get_display(reshape("مالیات بر ارزش افزوده")))
-    sh_added_value = str(get_display(reshape(f"{int(added_value):,}")))
-    added_row = ["", "", "", "", "", sh_added_label, sh_added_value]
-    data.append(list(reversed(added_row)))
-
-    # Final total including added value
-    final_total = net_after_discount + added_value
-    sh_total_label = str(get_display(reshape("جمع کل")))
-    sh_total_price = str(get_display(reshape(f"{int(final_total):,}")))
-    total_row = ["", "", "", "", "", sh_total_label, sh_total_price]
-    data.append(list(reversed(total_row)))
-
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    col_font = "Persian"
-    col_font_size = 10
-    num_cols = len(data[0])
-    col_widths = []
-    for idx in range(num_cols):
-        max_w = max(stringWidth(str(row[idx]), col_font, col_font_size) for row in data)
-        col_widths.append(max_w + 20)
+# Batch entry point: variant name -> (generator, takes a ``discount`` argument)
+_BATCH_VARIANTS = {
+    "standard": (generate_pdf, False),
+    "added_value": (generate_pdf_with_added_value, False),
+    "discount": (generate_pdf_with_discount, False),
+    "custom_discount": (generate_pdf_with_custom_discount, True),
+    "discount_added_value": (generate_pdf_with_discount_and_added_value, False),
+    "custom_discount_added_value": (generate_pdf_with_custom_discount_and_added_value, True),
+    "connection": (generate_connection_invoice_pdf, False),
+    "connection_added_value": (generate_connection_invoice_pdf_with_added_value, False),
+    "connection_discount": (generate_connection_invoice_pdf_with_discount, False),
+    "connection_custom_discount": (generate_connection_invoice_pdf_with_custom_discount, True),
+    "connection_discount_added_value": (generate_connection_invoice_pdf_with_discount_and_added_value, False),
+    "connection_custom_discount_added_value": (
+        generate_connection_invoice_pdf_with_custom_discount_and_added_value, True
+    ),
+}
 
-    tbl = Table(
-        data,
-        repeatRows=1,
-        colWidths=col_widths
-    )
-    tbl.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONT', (0, 0), (-1, -1), "Persian", 10),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('BACKGROUND', (0, -3), (1, -3), colors.lightgrey),
-        ('BACKGROUND', (0, -2), (1, -2), colors.lightgrey),
-        ('BACKGROUND', (0, -1), (1, -1), colors.lightgrey),
-        ('ALIGN', (1, len(data)-1), (1, len(data)-1), 'LEFT'),
-    ]))
-    elements.append(tbl)
 
-    # Add explanation text if provided
-    if explanation_text and explanation_text.strip():
-        elements.append(Spacer(1, 24))
-        sh_explanation_label = str(get_display(reshape("توضیحات:")))
-        sh_explanation = str(get_display(reshape(explanation_text)))
-        explanation_label_style = ParagraphStyle(
-            name="ExplanationLabel", fontName="Persian", fontSize=10,
-            alignment=TA_RIGHT, leading=14, spaceBefore=6
-        )
-        explanation_text_style = ParagraphStyle(
-            name="ExplanationText", fontName="Persian", fontSize=10,
-            alignment=TA_RIGHT, leading=14, rightIndent=0
-        )
-        elements.append(Paragraph(sh_explanation_label, explanation_label_style))
-        elements.append(Paragraph(sh_explanation, explanation_text_style))
-        elements.append(Spacer(1, 12))
+def _generate_single(variant: str, args: tuple, output_dir: Optional[str], explanation_text: Optional[str]) -> str:
+    """Build one invoice of ``variant``; module-level so worker processes can run it."""
+    generator = _BATCH_VARIANTS[variant][0]
+    return generator(*args, output_dir=output_dir, explanation_text=explanation_text)
 
-    # Write total in words
-    append_total_words(elements, final_total)
 
-    doc.build(elements, onFirstPage=_draw_logo, onLaterPages=_draw_logo)
-    print(f"Connection invoice PDF with custom discount and added value saved to: {pdf_file}")
-    return pdf_file
\ No newline at end of file
+def generate_pdfs_batch(
+    jobs: list[tuple],
+    variant: str = "standard",
+    output_dir: Optional[str] = None,
+    discount: Optional[float] = None,
+    max_workers: Optional[int] = None,
+) -> list[str]:
+    """Generate many invoices of one variant in a single call.
+
+    Args:
+        jobs (list[tuple]): ``(customer_name, items)`` or
+            ``(customer_name, items, explanation_text)`` per invoice.
+        variant (str): One of the keys of ``_BATCH_VARIANTS``.
+        output_dir (str, optional): Directory for the PDFs; defaults to 'خروجی'.
+        discount (float, optional): Discount for the ``custom_discount`` variants.
+        max_workers (int, optional): Worker processes to spread the invoices
+            over. Defaults to ``os.cpu_count()``; ``1`` builds everything in
+            the calling process.
+
+    Returns:
+        list[str]: Paths of the generated PDFs, in job order.
+
+    Raises:
+        ValueError: If ``variant`` is unknown or a custom-discount variant is
+            requested without a ``discount``.
+        FileExistsError: If a PDF for one of the reserved invoice numbers
+            already exists in ``output_dir``; nothing is built in that case.
+
+    Invoice numbers for the whole batch are reserved with a single update of
+    ``INVOICE_COUNTER_FILE`` before any PDF is built, so the workers share no
+    mutable state. Within a process the fonts, styles, shaped labels and logo
+    are shared by every invoice it builds; with the ``fork`` start method the
+    logo and discount tiers are loaded once up front and inherited by every
+    worker.
+    """
+    try:
+        takes_discount = _BATCH_VARIANTS[variant][1]
+    except KeyError:
+        raise ValueError(f"Unknown invoice variant: {variant!r}") from None
+    if takes_discount and discount is None:
+        raise ValueError(f"Variant {variant!r} requires a discount")
+    if not jobs:
+        return []
+
+    first_number = _reserve_invoice_numbers(len(jobs))
+    tasks = []
+    for offset, job in enumerate(jobs):
+        customer_name, items = job[0], job[1]
+        explanation_text = job[2] if len(job) > 2 else None
+        invoice_number = str(first_number + offset)
+        # An invoice number typed into the GUI can move the counter back, so
+        # never let a reserved number overwrite an invoice already issued
+        pdf_file = _invoice_path(output_dir, invoice_number)
+        if os.path.exists(pdf_file):
+            raise FileExistsError(f"Invoice PDF already exists: {pdf_file}")
+        args = (customer_name, invoice_number, items)
+        if takes_discount:
+            args += (discount,)
+        tasks.append((variant, args, output_dir, explanation_text))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(tasks))
+    if max_workers <= 1:
+        return [_generate_single(*task) for task in tasks]
+    if multiprocessing.get_start_method() == "fork":
+        # Forked workers inherit these caches, so load them once here rather
+        # than once per worker
+        _load_logo()
+        _get_thresholds()
+    # PDF assembly is CPU-bound Python, so use processes rather than threads
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_generate_single, *zip(*tasks)))
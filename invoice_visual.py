@@ -9,7 +9,8 @@ from create_pdf import (
     generate_pdf, to_persian_digits, generate_pdf_with_added_value, generate_pdf_with_discount,
     generate_pdf_with_custom_discount, generate_pdf_with_discount_and_added_value, generate_pdf_with_custom_discount_and_added_value,generate_connection_invoice_pdf,
     generate_connection_invoice_pdf_with_added_value,generate_connection_invoice_pdf_with_discount,generate_connection_invoice_pdf_with_custom_discount,
-    generate_connection_invoice_pdf_with_discount_and_added_value,generate_connection_invoice_pdf_with_custom_discount_and_added_value
+    generate_connection_invoice_pdf_with_discount_and_added_value,generate_connection_invoice_pdf_with_custom_discount_and_added_value,
+    write_invoice_counter, INVOICE_COUNTER_FILE
 )
 
 import os
@@ -138,7 +139,7 @@ class InvoiceApp(tk.Tk):
             self.output_dir = os.path.join(os.path.dirname(__file__), "خروجی")
         os.makedirs(self.output_dir, exist_ok=True)
         # Persistent counter file for invoice numbers
-        self.counter_file = os.path.join(os.path.expanduser("~"), ".invoice_app_counter.json")
+        self.counter_file = INVOICE_COUNTER_FILE
 
     def save_config(self):
         try:
@@ -818,8 +819,7 @@ class InvoiceApp(tk.Tk):
                 current_invoice_str_for_pdf = str(current_invoice_int_for_pdf)
             new_highest_for_record = current_invoice_int_for_pdf
             try:
-                with open(counter_path, "w", encoding="utf-8") as cf:
-                    json.dump({"counter": new_highest_for_record}, cf)
+                write_invoice_counter(counter_path, new_highest_for_record)
                 self.connection_invoice_entry.delete(0, tk.END)
                 self.connection_invoice_entry.insert(0, str(new_highest_for_record + 1))
             except Exception as e:
@@ -1138,8 +1138,7 @@ class InvoiceApp(tk.Tk):
 
         # Save this new highest number to the counter file
         try:
-            with open(counter_path, "w", encoding="utf-8") as cf:
-                json.dump({"counter": new_highest_for_record}, cf)
+            write_invoice_counter(counter_path, new_highest_for_record)
             
             # Update the invoice entry field to show the *next* suggested invoice number
             self.invoice_entry.delete(0, tk.END)
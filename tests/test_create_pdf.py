@@ -0,0 +1,152 @@
+import json
+import os
+import shutil
+import pytest
+from arabic_reshaper import reshape
+from bidi.algorithm import get_display
+from num2words import num2words
+
+import create_pdf as cp
+
+
+def test_shape_ascii_passthrough():
+    assert cp._shape("1,234,500") == "1,234,500"
+
+
+def test_shape_persian_matches_bidi():
+    text = "جمع کل: 1,000"
+    assert cp._shape(text) == get_display(reshape(text))
+
+
+def test_build_item_rows_formats_and_totals():
+    items = [
+        {"diameter": 110.0, "sdr": 17, "pe_grade": "PE۱۰۰", "length": 12.5, "weight_per_meter": 0.95,
+         "total_weight": 11.875, "price_per_kg": 60000, "total_price": 712500},
+        {"diameter": 90, "sdr": 13.6, "pe_grade": "PE80", "length": 6, "weight_per_meter": 0.75,
+         "total_weight": 4.5, "price_per_kg": 62000.0, "total_price": 279000.0},
+    ]
+    rows, total = cp._build_item_rows(items)
+    assert rows == [
+        ["712,500", "60,000", "11.875", "0.950", "12.50", "PE100", "17", "110", "1"],
+        ["279,000", "62,000", "4.500", "0.750", "6.00", "PE80", "13", "90", "2"],
+    ]
+    assert total == 991500.0
+
+
+def test_conn_item_rows_are_in_display_order():
+    item = {"type": "فلنج", "product": "P1", "pn": "6", "size": "63", "quantity": 2.0,
+            "unit_price": 1500.0, "total_price": 3000}
+    rows = list(cp._conn_item_rows([item]))
+    assert rows == [["3,000", "1,500", "2", "63", "6", "P1", get_display(reshape("فلنج"))]]
+
+
+def test_item_col_widths_match_header_width():
+    for widths in (cp._ITEM_COL_WIDTHS, cp._ITEM_COL_WIDTHS_ADDED, cp._ITEM_COL_WIDTHS_DISCOUNT_ADDED):
+        assert len(widths) == len(cp._SH_HEADERS_REV) == 2 + len(cp._ITEM_FOOTER_BLANKS)
+
+
+def test_tiered_discount_applies_each_tier_to_its_band():
+    thresholds = ((0.0, 0.0), (100.0, 2.0), (500.0, 5.0))
+    assert cp._tiered_discount(50.0, thresholds) == 0.0
+    assert cp._tiered_discount(300.0, thresholds) == pytest.approx(4.0)
+    assert cp._tiered_discount(700.0, thresholds) == pytest.approx(400 * 0.02 + 200 * 0.05)
+
+
+def test_custom_discount_is_percentage_up_to_100_else_absolute():
+    assert cp._custom_discount_amount(2000.0, 10) == pytest.approx(200.0)
+    assert cp._custom_discount_amount(2000.0, 100) == pytest.approx(2000.0)
+    assert cp._custom_discount_amount(2000.0, 150) == 150
+
+
+def test_next_invoice_number_increments_counter_file(tmp_path, monkeypatch):
+    counter_file = tmp_path / "invoice_counter.json"
+    monkeypatch.setattr(cp, "INVOICE_COUNTER_FILE", str(counter_file))
+    cp.write_invoice_counter(str(counter_file), 41)
+    assert cp._get_next_invoice_number() == "42"
+    assert cp._get_next_invoice_number() == "43"
+    assert json.loads(counter_file.read_text()) == {"counter": 43}
+
+
+def test_generate_pdfs_batch_numbers_invoices_from_counter(tmp_path, monkeypatch):
+    counter_file = tmp_path / "invoice_counter.json"
+    monkeypatch.setattr(cp, "INVOICE_COUNTER_FILE", str(counter_file))
+    monkeypatch.setattr(cp, "fetch_current_jalali_date", lambda: "1404/01/01")
+    cp.write_invoice_counter(str(counter_file), 7)
+    item = {"diameter": 90, "sdr": 11, "pe_grade": "PE100", "length": 6, "weight_per_meter": 1.0,
+            "total_weight": 6.0, "price_per_kg": 1000, "total_price": 6000}
+    jobs = [("مشتری الف", [item]), ("مشتری ب", [item, item], "توضیحات")]
+
+    paths = cp.generate_pdfs_batch(jobs, variant="added_value", output_dir=str(tmp_path), max_workers=1)
+
+    assert [os.path.basename(p) for p in paths] == ["8.pdf", "9.pdf"]
+    assert all(os.path.getsize(p) > 0 for p in paths)
+    assert json.loads(counter_file.read_text()) == {"counter": 9}
+
+
+def test_generate_pdfs_batch_in_worker_processes(tmp_path, monkeypatch):
+    counter_file = tmp_path / "invoice_counter.json"
+    monkeypatch.setattr(cp, "INVOICE_COUNTER_FILE", str(counter_file))
+    cp.write_invoice_counter(str(counter_file), 20)
+    item = {"type": "فلنج", "product": "P1", "pn": "6", "size": "63", "quantity": 2,
+            "unit_price": 1500, "total_price": 3000}
+    jobs = [("مشتری الف", [item]), ("مشتری ب", [item, item]), ("مشتری ج", [item], "توضیحات")]
+
+    paths = cp.generate_pdfs_batch(jobs, variant="connection", output_dir=str(tmp_path), max_workers=2)
+
+    assert [os.path.basename(p) for p in paths] == ["21.pdf", "22.pdf", "23.pdf"]
+    assert all(os.path.getsize(p) > 0 for p in paths)
+    assert json.loads(counter_file.read_text()) == {"counter": 23}
+
+
+def test_generate_pdfs_batch_refuses_to_overwrite_issued_invoice(tmp_path, monkeypatch):
+    counter_file = tmp_path / "invoice_counter.json"
+    monkeypatch.setattr(cp, "INVOICE_COUNTER_FILE", str(counter_file))
+    cp.write_invoice_counter(str(counter_file), 3)
+    issued = tmp_path / "5.pdf"
+    issued.write_bytes(b"issued")
+    item = {"diameter": 90, "sdr": 11, "pe_grade": "PE100", "length": 6, "weight_per_meter": 1.0,
+            "total_weight": 6.0, "price_per_kg": 1000, "total_price": 6000}
+
+    with pytest.raises(FileExistsError):
+        cp.generate_pdfs_batch([("x", [item]), ("y", [item])], output_dir=str(tmp_path), max_workers=1)
+
+    assert issued.read_bytes() == b"issued"
+    assert not (tmp_path / "4.pdf").exists()
+
+
+def test_generate_pdfs_batch_rejects_unknown_variant():
+    with pytest.raises(ValueError):
+        cp.generate_pdfs_batch([("x", [])], variant="nope")
+
+
+def test_build_item_rows_shapes_persian_grade_text():
+    item = {"diameter": 63, "sdr": 11, "pe_grade": "پلی اتیلن ۱۰۰", "length": 1, "weight_per_meter": 1,
+            "total_weight": 1, "price_per_kg": 1, "total_price": 1}
+    rows, _ = cp._build_item_rows([item])
+    assert rows[0][5] == get_display(reshape("پلی اتیلن 100"))
+
+
+def test_number_to_words_matches_num2words_and_falls_back():
+    assert cp.number_to_words(1234567.9) == num2words(1234567, lang="fa")
+    assert cp.number_to_words(float("nan")) == "nan"
+
+
+@pytest.mark.parametrize("content", ['{"counter": null}', '{"other": 5}'])
+def test_next_invoice_number_rejects_counter_file_without_counter(tmp_path, monkeypatch, content):
+    counter_file = tmp_path / "invoice_counter.json"
+    monkeypatch.setattr(cp, "INVOICE_COUNTER_FILE", str(counter_file))
+    counter_file.write_text(content)
+    with pytest.raises((KeyError, TypeError)):
+        cp._get_next_invoice_number()
+    assert counter_file.read_text() == content
+
+
+def test_generate_pdf_recreates_deleted_output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cp, "fetch_current_jalali_date", lambda: "1404/01/01")
+    out = tmp_path / "out"
+    item = {"diameter": 90, "sdr": 11, "pe_grade": "PE100", "length": 6, "weight_per_meter": 1.0,
+            "total_weight": 6.0, "price_per_kg": 1000, "total_price": 6000}
+    cp.generate_pdf("مشتری", "1", [item], output_dir=str(out))
+    shutil.rmtree(out)
+    path = cp.generate_pdf("مشتری", "2", [item], output_dir=str(out))
+    assert os.path.getsize(path) > 0